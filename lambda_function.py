@@ -1,148 +1,515 @@
 import boto3
-import pandas as pd
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+import ijson
+import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+import simdjson
 import urllib.parse
 import os
 import io
+import posixpath
+import time
 
-# AWS SDK clients
-s3_client = boto3.client('s3')
+# AWS SDK clients; the S3 connection pool is sized for the parallel ranged GETs
+# and kept alive so warm invocations reuse open connections
+s3_client = boto3.client('s3', config=Config(max_pool_connections=16, tcp_keepalive=True))
 glue_client = boto3.client('glue')
 
+# Arrow's native S3 client, used to stream Parquet output straight to S3
+s3_filesystem = pafs.S3FileSystem(region=os.environ.get('AWS_REGION'))
+
+# Objects at or above this size are downloaded with parallel ranged GETs
+MULTIPART_THRESHOLD = 8 << 20
+transfer_config = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=8 << 20,
+    max_concurrency=8,
+    use_threads=True
+)
+
 # S3 and Glue catalog environment variables
 os_input_s3_cleansed_layer = os.environ['s3_cleansed_layer']
 os_input_glue_catalog_db_name = os.environ['glue_catalog_db_name']
 os_input_glue_catalog_table_name = os.environ['glue_catalog_table_name']
 os_input_write_data_operation = os.environ['write_data_operation']
 
-def get_glue_table_schema(database_name, table_name):
+# Glue table definitions cached across warm invocations, keyed by (database, table)
+SCHEMA_CACHE_TTL_SECONDS = 300
+schema_cache = {}
+
+# Arrow types for the Glue column types the Lambda casts to; others are left as parsed
+GLUE_TO_ARROW_TYPES = {
+    'bigint': pa.int64(),
+    'double': pa.float64(),
+    'boolean': pa.bool_(),
+    'string': pa.string(),
+    'timestamp': pa.timestamp('us')
+}
+
+# Formats the string casts accept; other strings are nulled up front, like pandas' errors='coerce'
+COERCE_PATTERNS = {
+    pa.int64(): r'^-?\d+$',
+    pa.float64(): r'(?i)^[+-]?((\d+\.?\d*|\.\d+)(e[+-]?\d+)?|nan|inf|infinity)$',
+    pa.bool_(): r'(?i)^(true|false|1|0)$'
+}
+TIMESTAMP_DATE_PATTERN = r'^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])'
+TIMESTAMP_NAIVE_PATTERN = TIMESTAMP_DATE_PATTERN + r'([ T]([01]\d|2[0-3])(:[0-5]\d(:[0-5]\d(\.\d{1,6})?)?)?)?$'
+TIMESTAMP_ZONED_PATTERN = TIMESTAMP_DATE_PATTERN + r'[ T]([01]\d|2[0-3]):[0-5]\d:[0-5]\d(\.\d{1,6})?(Z|[+-]\d{2}(:?\d{2})?)$'
+
+# Number of JSON items converted to Arrow at a time while streaming
+ITEMS_BATCH_SIZE = 10_000
+
+# Parquet layout: bounded row groups with min/max statistics so readers can skip row groups
+PARQUET_ROW_GROUP_SIZE = 128_000
+PARQUET_DATA_PAGE_SIZE = 1 << 20
+
+# Filter/join keys that get Parquet Bloom filters so readers can skip row groups on equality lookups
+PARQUET_BLOOM_FILTER_COLUMNS = ['category_id', 'region']
+PARQUET_BLOOM_FILTER_FPP = 0.05
+
+# Columns the cleansed output is Hive-partitioned by, matching the reporting job's sink;
+# only used when the Glue table declares them as its partition keys
+PARTITION_COLUMNS = ['region', 'category_id']
+
+# Reused across warm invocations so simdjson keeps its internal buffers allocated
+json_parser = simdjson.Parser()
+
+def get_glue_table(database_name, table_name):
     """
-    Get the schema of the Glue table to ensure the DataFrame matches the updated schema.
+    Get the Glue table definition. Definitions are cached for a few minutes
+    so warm containers skip the Glue API call.
     """
+    cache_key = (database_name, table_name)
+    cached = schema_cache.get(cache_key)
+    if cached is not None and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL_SECONDS:
+        return cached[1]
+
     try:
-        response = glue_client.get_table(DatabaseName=database_name, Name=table_name)
-        columns = response['Table']['StorageDescriptor']['Columns']
-        return {col['Name']: col['Type'] for col in columns}
+        glue_table = glue_client.get_table(DatabaseName=database_name, Name=table_name)['Table']
+        schema_cache[cache_key] = (time.monotonic(), glue_table)
+        return glue_table
     except glue_client.exceptions.EntityNotFoundException:
         print(f"Table {table_name} not found in database {database_name}.")
         raise
 
-def cast_dataframe_to_glue_schema(df, glue_schema):
+def glue_schema_from_table(glue_table):
+    """
+    Get the schema of the Glue table to ensure the Arrow table matches the updated schema.
+    """
+    # Partition keys are columns of the table too, they are just listed separately
+    columns = glue_table['StorageDescriptor']['Columns'] + glue_table.get('PartitionKeys', [])
+    return {col['Name']: col['Type'] for col in columns}
+
+def load_items_table(bucket, key, size):
+    """
+    Load the 'items' array of a JSON object in S3 into an Arrow table. The size comes from
+    the S3 event record. Small objects are parsed as they stream in; large ones are
+    downloaded over several connections and parsed in one pass with simdjson.
+    """
+    if size < MULTIPART_THRESHOLD:
+        response = s3_client.get_object(Bucket=bucket, Key=key)
+        return read_items_table(response['Body'])
+
+    # A single GET is throttled per connection, so fan large objects out into ranged GETs
+    buffer = io.BytesIO()
+    s3_client.download_fileobj(bucket, key, buffer, Config=transfer_config)
+    # getbuffer() hands simdjson the downloaded bytes without copying them
+    document = json_parser.parse(buffer.getbuffer())
+    # A missing 'items' key gives an empty table, as on the streaming path
+    items = document['items'].as_list() if 'items' in document else []
+    # The module-level parser can only be reused once its document is released
+    del document
+    return table_from_items(items)
+
+def flatten_table(table):
+    """
+    Flatten nested struct columns into dotted top-level columns, like pd.json_normalize.
+    """
+    while any(pa.types.is_struct(field.type) for field in table.schema):
+        table = table.flatten()
+    return table
+
+def json_text_array(values):
+    """
+    Build a string array from arbitrary JSON values, keeping strings as they are
+    and storing everything else as JSON text.
+    """
+    return pa.array([
+        value if value is None or isinstance(value, str) else json.dumps(value, default=str)
+        for value in values
+    ], type=pa.string())
+
+def table_from_items(items):
+    """
+    Build an Arrow table from parsed JSON items. Fields whose values mix incompatible types
+    are stored as JSON text, like the object columns pandas produced, so the Glue cast can coerce them.
+    """
+    try:
+        return pa.Table.from_pylist(items)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    columns = {}
+    for name in dict.fromkeys(name for item in items for name in item):
+        values = [item.get(name) for item in items]
+        try:
+            columns[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[name] = json_text_array(values)
+    return pa.table(columns)
+
+def concat_item_tables(tables):
+    """
+    Concatenate the per-batch tables, widening types that differ between batches.
+    Fields whose types cannot be unified (e.g. double and string) become JSON text in every batch.
+    """
+    try:
+        return pa.concat_tables(tables, promote_options='permissive')
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    fields = {}
+    for table in tables:
+        for field in table.schema:
+            fields.setdefault(field.name, []).append(field)
+    conflicting = set()
+    for name, same_name_fields in fields.items():
+        try:
+            pa.unify_schemas([pa.schema([field]) for field in same_name_fields], promote_options='permissive')
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            conflicting.add(name)
+
+    tables = [
+        pa.Table.from_arrays(
+            [json_text_array(table.column(name).to_pylist()) if name in conflicting else table.column(name)
+             for name in table.column_names],
+            names=table.column_names
+        )
+        for table in tables
+    ]
+    return pa.concat_tables(tables, promote_options='permissive')
+
+def read_items_table(stream):
+    """
+    Incrementally parse the 'items' array of a JSON stream into an Arrow table.
+    """
+    tables = []
+    batch = []
+    for item in ijson.items(stream, 'items.item', buf_size=1 << 20, use_float=True):
+        batch.append(item)
+        if len(batch) == ITEMS_BATCH_SIZE:
+            tables.append(table_from_items(batch))
+            batch = []
+    if batch or not tables:
+        tables.append(table_from_items(batch))
+    # Batches infer their types independently, so unify them on concatenation
+    return concat_item_tables(tables)
+
+def arrow_schema_from_glue(glue_schema):
     """
-    Cast the DataFrame columns to match the types in the Glue table schema.
+    Build the Arrow schema for the Glue columns whose types the Lambda casts to.
     """
-    for column, dtype in glue_schema.items():
-        if column in df.columns:
-            if dtype == 'bigint':
-                df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
-            elif dtype == 'double':
-                df[column] = pd.to_numeric(df[column], errors='coerce').astype(float)
-            elif dtype == 'boolean':
-                df[column] = df[column].astype(bool)
-            elif dtype == 'string':
-                df[column] = df[column].astype(str)
-            elif dtype == 'timestamp':
-                df[column] = pd.to_datetime(df[column], errors='coerce')
-    return df
+    return pa.schema([
+        (column, GLUE_TO_ARROW_TYPES[dtype])
+        for column, dtype in glue_schema.items()
+        if dtype in GLUE_TO_ARROW_TYPES
+    ])
 
-def infer_glue_schema_from_dataframe(df):
+def parse_timestamps(column, target_type):
     """
-    Infer the schema for AWS Glue based on the DataFrame's columns and data types.
+    Parse ISO-8601 strings into naive timestamps. Values with a zone offset, such as the
+    '2017-11-13T17:13:01.000Z' format of the YouTube API, are converted to UTC first.
+    Strings in neither form become null.
+    """
+    null = pa.scalar(None, pa.string())
+    naive = pc.if_else(pc.match_substring_regex(column, TIMESTAMP_NAIVE_PATTERN), column, null)
+    zoned = pc.if_else(pc.match_substring_regex(column, TIMESTAMP_ZONED_PATTERN), column, null)
+    zoned = pc.cast(pc.cast(zoned, pa.timestamp(target_type.unit, tz='UTC')), target_type)
+    return pc.coalesce(pc.cast(naive, target_type), zoned)
+
+def coerce_column(column, target_type):
+    """
+    Cast a column to the target type, turning values that cannot be converted into nulls
+    like pandas' errors='coerce'. Nested values cast to string are stored as JSON text.
+    """
+    if column.type == target_type:
+        return column
+    if pa.types.is_string(target_type) and pa.types.is_nested(column.type):
+        return json_text_array(column.to_pylist())
+
+    if pa.types.is_string(column.type):
+        column = pc.utf8_trim_whitespace(column)
+        if pa.types.is_timestamp(target_type):
+            try:
+                return parse_timestamps(column, target_type)
+            except pa.ArrowInvalid:
+                # Only impossible calendar dates such as 2017-02-30 get past the format checks,
+                # so this rare case parses value by value to null just those
+                values = []
+                for value in column.to_pylist():
+                    try:
+                        values.append(parse_timestamps(pa.array([value], type=pa.string()), target_type)[0].as_py())
+                    except pa.ArrowInvalid:
+                        values.append(None)
+                return pa.array(values, type=target_type)
+        pattern = COERCE_PATTERNS.get(target_type)
+        if pattern is not None:
+            # Null out malformed values first so the cast below converts the rest in one go
+            valid = pc.match_substring_regex(column, pattern)
+            column = pc.if_else(valid, column, pa.scalar(None, pa.string()))
+
+    try:
+        # safe=False truncates fractional doubles cast to bigint (1.7 -> 1) where pandas raised
+        return pc.cast(column, target_type, safe=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # No conversion exists between the types (e.g. a list to a number), so no value survives
+        return pa.nulls(len(column), type=target_type)
+
+def rename_to_glue_columns(table, glue_columns):
+    """
+    Rename table columns to the Glue column they match case-insensitively, since Glue
+    lowercases column names. A column is left alone if the Glue name is already taken.
+    """
+    glue_names = {name.lower(): name for name in glue_columns}
+    names = []
+    for name in table.column_names:
+        glue_name = glue_names.get(name.lower(), name)
+        names.append(glue_name if glue_name not in table.column_names else name)
+    return table.rename_columns(names)
+
+def cast_table_to_glue_schema(table, arrow_schema):
+    """
+    Cast the Arrow table columns to match the types in the Glue table schema in a single pass,
+    falling back to a per-column cast that nulls out values which cannot be converted.
+    """
+    table = rename_to_glue_columns(table, arrow_schema.names)
+    schema = pa.schema([
+        arrow_schema.field(field.name) if field.name in arrow_schema.names else field
+        for field in table.schema
+    ])
+    if schema.equals(table.schema):
+        # The parsed types already match the Glue schema, so there is nothing to cast
+        return table
+    try:
+        # safe=False truncates fractional doubles cast to bigint (1.7 -> 1) where pandas raised
+        return table.cast(schema, safe=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        columns = [coerce_column(table.column(index), field.type) for index, field in enumerate(schema)]
+        return pa.Table.from_arrays(columns, schema=schema)
+
+def downcast_table(table, glue_types):
+    """
+    Narrow int64 columns that Glue declares as 'int' to int32, shrinking the output and
+    downstream join hash tables.
+    Columns declared 'bigint' stay int64 so every file agrees with the Glue schema.
+    """
+    for index, field in enumerate(table.schema):
+        column = table.column(index)
+        if pa.types.is_int64(field.type) and glue_types.get(field.name) == 'int':
+            min_max = pc.min_max(column)
+            low, high = min_max['min'].as_py(), min_max['max'].as_py()
+            if low is None or (-2**31 <= low and high < 2**31):
+                table = table.set_column(index, field.name, column.cast(pa.int32()))
+    return table
+
+def infer_glue_schema_from_table(table):
+    """
+    Infer the schema for AWS Glue based on the Arrow table's columns and data types.
     """
     glue_schema = []
-    for column, dtype in df.dtypes.items():
-        if pd.api.types.is_integer_dtype(dtype):
+    for field in table.schema:
+        if pa.types.is_integer(field.type):
             glue_type = 'int'
-        elif pd.api.types.is_float_dtype(dtype):
+        elif pa.types.is_floating(field.type):
             glue_type = 'double'
-        elif pd.api.types.is_bool_dtype(dtype):
+        elif pa.types.is_boolean(field.type):
             glue_type = 'boolean'
-        elif pd.api.types.is_datetime64_any_dtype(dtype):
+        elif pa.types.is_timestamp(field.type):
             glue_type = 'timestamp'
         else:
             glue_type = 'string'  # Default to string if no match
 
-        glue_schema.append({'Name': column, 'Type': glue_type})
+        glue_schema.append({'Name': field.name, 'Type': glue_type})
     
     return glue_schema
 
-def create_glue_table_if_not_exists(database_name, table_name, s3_location, glue_schema):
+def create_glue_table(database_name, table_name, s3_location, glue_schema):
     """
-    Create the AWS Glue table dynamically if it doesn't exist.
+    Create the AWS Glue table dynamically. Callers have already found the table to be missing.
     """
-    try:
-        # Attempt to get the table, if it doesn't exist, an EntityNotFoundException will be raised
-        glue_client.get_table(DatabaseName=database_name, Name=table_name)
-        print(f"Table {table_name} already exists in database {database_name}.")
-    except glue_client.exceptions.EntityNotFoundException:
-        # If table not found, create it
-        print(f"Table {table_name} does not exist. Creating with inferred schema...")
-        glue_client.create_table(
+    print(f"Table {table_name} does not exist. Creating with inferred schema...")
+    glue_client.create_table(
+        DatabaseName=database_name,
+        TableInput={
+            'Name': table_name,
+            'StorageDescriptor': {
+                'Columns': glue_schema,  # Dynamically inferred schema
+                'Location': s3_location,
+                'InputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat',
+                'OutputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat',
+                'Compressed': False,
+                'SerdeInfo': {
+                    'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
+                }
+            },
+            'TableType': 'EXTERNAL_TABLE'
+        }
+    )
+    print(f"Table {table_name} created successfully with schema: {glue_schema}")
+
+def register_glue_partitions(database_name, table_name, glue_table, table, partition_cols):
+    """
+    Register the partitions present in the table with the Glue catalog so Athena and Spark see them.
+    Partitions that are already registered are left as they are.
+    """
+    partition_values = pa.table({
+        column: pc.cast(table.column(column), pa.string()) for column in partition_cols
+    }).group_by(partition_cols).aggregate([]).to_pylist()
+
+    table_location = glue_table['StorageDescriptor']['Location'].rstrip('/')
+    partition_inputs = []
+    for row in partition_values:
+        values = ['__HIVE_DEFAULT_PARTITION__' if row[column] is None else row[column] for column in partition_cols]
+        partition_path = '/'.join(
+            f"{column}={urllib.parse.quote(value, safe='')}" for column, value in zip(partition_cols, values)
+        )
+        partition_inputs.append({
+            'Values': values,
+            'StorageDescriptor': {**glue_table['StorageDescriptor'], 'Location': f"{table_location}/{partition_path}/"}
+        })
+
+    # batch_create_partition accepts at most 100 partitions per call
+    for start in range(0, len(partition_inputs), 100):
+        response = glue_client.batch_create_partition(
             DatabaseName=database_name,
-            TableInput={
-                'Name': table_name,
-                'StorageDescriptor': {
-                    'Columns': glue_schema,  # Dynamically inferred schema
-                    'Location': s3_location,
-                    'InputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat',
-                    'OutputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat',
-                    'Compressed': False,
-                    'SerdeInfo': {
-                        'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
-                    }
-                },
-                'TableType': 'EXTERNAL_TABLE'
-            }
+            TableName=table_name,
+            PartitionInputList=partition_inputs[start:start + 100]
         )
-        print(f"Table {table_name} created successfully with schema: {glue_schema}")
+        for error in response.get('Errors', []):
+            if error['ErrorDetail']['ErrorCode'] != 'AlreadyExistsException':
+                raise RuntimeError(f"Failed to register partition {error['PartitionValues']}: {error['ErrorDetail']}")
 
-def lambda_handler(event, context):
-    bucket = event['Records'][0]['s3']['bucket']['name']
-    key = urllib.parse.unquote_plus(event['Records'][0]['s3']['object']['key'], encoding='utf-8')
+def write_parquet(table, s3_key, glue_table=None):
+    """
+    Write the table as Parquet under the given key of the cleansed bucket.
+    When the Glue table is partitioned by the partition columns, the table is written as a
+    Hive-partitioned dataset under the Glue table's location and the partitions are registered.
+    """
+    write_options = {
+        'compression': 'snappy',
+        'row_group_size': PARQUET_ROW_GROUP_SIZE,
+        'data_page_size': PARQUET_DATA_PAGE_SIZE,
+        # The writer falls back to plain encoding for high-cardinality columns on its own
+        'use_dictionary': True,
+        'write_statistics': True,
+        # Per-page min/max (column index) lets readers skip pages inside a row group too
+        'write_page_index': True,
+        # Sized for the worst case of every row holding a distinct value
+        'bloom_filter_options': {
+            column: {'ndv': max(table.num_rows, 1), 'fpp': PARQUET_BLOOM_FILTER_FPP}
+            for column in PARQUET_BLOOM_FILTER_COLUMNS
+            if column in table.column_names
+        }
+    }
+    path = f"{os_input_s3_cleansed_layer}/{s3_key}"
+    partition_cols = [col['Name'] for col in glue_table.get('PartitionKeys', [])] if glue_table else []
 
-    try:
-        # Fetching file from S3
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        content = response['Body'].read()
+    if (not partition_cols
+            or not set(partition_cols) <= set(PARTITION_COLUMNS)
+            or not set(partition_cols) <= set(table.column_names)):
+        # Convert table to Parquet, uploading row groups to S3 as they are encoded
+        with s3_filesystem.open_output_stream(path) as output_stream:
+            pq.write_table(table, output_stream, **write_options)
+        return
 
-        # Load JSON into DataFrame
-        df_raw = pd.read_json(io.BytesIO(content))
+    # Partition directories go under the table location, where the registered partitions point
+    root_path = glue_table['StorageDescriptor']['Location'].replace('s3://', '', 1).rstrip('/')
+    pq.write_to_dataset(
+        table,
+        root_path=root_path,
+        partition_cols=partition_cols,
+        filesystem=s3_filesystem,
+        # Name the files after the full source key so reprocessing it overwrites rather than
+        # duplicates, and objects with the same name in different folders do not collide
+        basename_template=f"{posixpath.splitext(s3_key)[0].replace('/', '_')}-{{i}}.parquet",
+        # Only the partitions in this write are touched: if a reprocessed object no longer has
+        # rows for a partition, its earlier file there is left behind and must be removed by hand
+        existing_data_behavior='overwrite_or_ignore',
+        **write_options
+    )
+    register_glue_partitions(
+        os_input_glue_catalog_db_name,
+        os_input_glue_catalog_table_name,
+        glue_table,
+        table,
+        partition_cols
+    )
 
-        # Normalize JSON data
-        df_step_1 = pd.json_normalize(df_raw['items'])
+def lambda_handler(event, context):
+    # The Glue table is looked up once and reused for every record in the event
+    glue_table = None
+    glue_schema = None
+    arrow_schema = None
+    processed_keys = []
+
+    for record in event['Records']:
+        bucket = record['s3']['bucket']['name']
+        key = urllib.parse.unquote_plus(record['s3']['object']['key'], encoding='utf-8')
+        size = record['s3']['object']['size']
 
         try:
-            # Fetch the updated Glue table schema if the table exists
-            glue_schema = get_glue_table_schema(os_input_glue_catalog_db_name, os_input_glue_catalog_table_name)
-            # Cast the DataFrame columns to match the Glue schema
-            df_step_1 = cast_dataframe_to_glue_schema(df_step_1, glue_schema)
-        except glue_client.exceptions.EntityNotFoundException:
-            # If Glue table doesn't exist, infer schema from DataFrame and create table
-            glue_schema = infer_glue_schema_from_dataframe(df_step_1)
-            create_glue_table_if_not_exists(
-                os_input_glue_catalog_db_name,
-                os_input_glue_catalog_table_name,
-                f"s3://{os_input_s3_cleansed_layer}/",
-                glue_schema
-            )
-
-        # Convert DataFrame to Parquet and upload to S3
-        parquet_buffer = io.BytesIO()
-        df_step_1.to_parquet(parquet_buffer, index=False)
-
-        # Define S3 key for the Parquet file
-        s3_key = f"{key.replace('.json', '.parquet')}"
-        s3_client.put_object(
-            Bucket=os_input_s3_cleansed_layer,
-            Key=s3_key,
-            Body=parquet_buffer.getvalue()
-        )
+            # Fetching file from S3 and parsing the items into an Arrow table
+            table = load_items_table(bucket, key, size)
 
-        return {
-            'statusCode': 200,
-            'body': f"File {key} processed and saved as Parquet."
-        }
+            # Normalize JSON data
+            table = flatten_table(table)
+
+            if glue_schema is None:
+                try:
+                    # Fetch the updated Glue table schema if the table exists
+                    glue_table = get_glue_table(os_input_glue_catalog_db_name, os_input_glue_catalog_table_name)
+                    glue_schema = glue_schema_from_table(glue_table)
+                    arrow_schema = arrow_schema_from_glue(glue_schema)
+                except glue_client.exceptions.EntityNotFoundException:
+                    # If Glue table doesn't exist, infer schema from the table and create it;
+                    # later records pick up the new table's schema
+                    inferred_schema = infer_glue_schema_from_table(table)
+                    create_glue_table(
+                        os_input_glue_catalog_db_name,
+                        os_input_glue_catalog_table_name,
+                        f"s3://{os_input_s3_cleansed_layer}/",
+                        inferred_schema
+                    )
+                    # Store integers in the narrowest type the inferred schema allows
+                    table = downcast_table(table, {col['Name']: col['Type'] for col in inferred_schema})
+
+            if glue_schema is not None:
+                # Cast the table columns to match the Glue schema
+                table = cast_table_to_glue_schema(table, arrow_schema)
+                # Keep only the columns the Glue table declares, matched regardless of case
+                table = rename_to_glue_columns(table, glue_schema)
+                dropped_columns = [column for column in table.column_names if column not in glue_schema]
+                if dropped_columns:
+                    print(f"Dropping columns {', '.join(dropped_columns)} not in the Glue table.")
+                table = table.select([column for column in glue_schema if column in table.column_names])
+                # Store integers in the narrowest type the Glue schema allows
+                table = downcast_table(table, glue_schema)
+
+            # Define S3 key for the Parquet file and write it to the cleansed layer
+            s3_key = f"{key.replace('.json', '.parquet')}"
+            write_parquet(table, s3_key, glue_table)
+            processed_keys.append(key)
+
+        except Exception as e:
+            print(e)
+            print(f"Error processing object {key} from bucket {bucket}.")
+            raise e
 
-    except Exception as e:
-        print(e)
-        print(f"Error processing object {key} from bucket {bucket}.")
-        raise e
\ No newline at end of file
+    return {
+        'statusCode': 200,
+        'body': f"Files {', '.join(processed_keys)} processed and saved as Parquet."
+    }
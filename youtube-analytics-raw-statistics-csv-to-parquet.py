@@ -28,6 +28,6 @@ datasink1 = ChangeSchema_node1728861775366.toDF().coalesce(1)
 df_final_output = DynamicFrame.fromDF(datasink1, glueContext, "df_final_output")
 
 # Script generated for node Amazon S3
-AmazonS3_node1728861633433 = glueContext.write_dynamic_frame.from_options(frame=ChangeSchema_node1728861775366, connection_type="s3", format="glueparquet", connection_options={"path": "s3://de-youtube-analytics-cleansed-useast1-dev/youtube/raw_statistics/", "partitionKeys": ["region"]}, format_options={"compression": "snappy"}, transformation_ctx="AmazonS3_node1728861633433")
+AmazonS3_node1728861633433 = glueContext.write_dynamic_frame.from_options(frame=ChangeSchema_node1728861775366, connection_type="s3", format="glueparquet", connection_options={"path": "s3://de-youtube-analytics-cleansed-useast1-dev/youtube/raw_statistics/", "partitionKeys": ["region", "category_id"]}, format_options={"compression": "snappy"}, transformation_ctx="AmazonS3_node1728861633433")
 
 job.commit()
\ No newline at end of file
@@ -4,6 +4,8 @@ from awsglue.utils import getResolvedOptions
 from pyspark.context import SparkContext
 from awsglue.context import GlueContext
 from awsglue.job import Job
+from awsglue.dynamicframe import DynamicFrame
+from pyspark.sql.functions import broadcast, col
 
 args = getResolvedOptions(sys.argv, ['JOB_NAME'])
 sc = SparkContext()
@@ -12,18 +14,43 @@ spark = glueContext.spark_session
 job = Job(glueContext)
 job.init(args['JOB_NAME'], args)
 
-# Script generated for node AWS Glue Data Catalog
-AWSGlueDataCatalog_node1728935089386 = glueContext.create_dynamic_frame.from_catalog(database="db_youtube_cleaned", table_name="raw_statistics", transformation_ctx="AWSGlueDataCatalog_node1728935089386")
+# Let Spark broadcast join inputs up to 32 MB
+spark.conf.set("spark.sql.autoBroadcastJoinThreshold", "33554432")
+
+# Compress the reporting output with zstd (level 3) for smaller files at similar decode speed
+spark.conf.set("spark.sql.parquet.compression.codec", "zstd")
+spark.conf.set("parquet.compression.codec.zstd.level", "3")
 
 # Script generated for node Amazon S3
 AmazonS3_node1728935071099 = glueContext.create_dynamic_frame.from_options(format_options={}, connection_type="s3", format="parquet", connection_options={"paths": ["s3://de-youtube-analytics-cleansed-useast1-dev/youtube/raw_statistics_reference_data/"], "recurse": True}, transformation_ctx="AmazonS3_node1728935071099")
+ref_df = AmazonS3_node1728935071099.toDF()
 
-# Script generated for node Join
-Join_node1728935104238 = Join.apply(frame1=AWSGlueDataCatalog_node1728935089386, frame2=AmazonS3_node1728935071099, keys1=["category_id"], keys2=["id"], transformation_ctx="Join_node1728935104238")
+# raw_statistics is partitioned by category_id, and partitions for categories missing from the
+# reference data can never match the inner join, so only list and read the matching ones
+# The ids are interpolated into a quoted predicate, so keep them to integers and skip nulls
+category_ids = [int(row.id) for row in ref_df.select("id").distinct().collect() if row.id is not None]
+
+# Without reference categories the inner join is empty, so there is nothing to read or write
+if category_ids:
+    category_predicate = "category_id in ({})".format(", ".join(f"'{category_id}'" for category_id in category_ids))
+
+    # Script generated for node AWS Glue Data Catalog
+    AWSGlueDataCatalog_node1728935089386 = glueContext.create_dynamic_frame.from_catalog(database="db_youtube_cleaned", table_name="raw_statistics", transformation_ctx="AWSGlueDataCatalog_node1728935089386", push_down_predicate = category_predicate)
+
+    # Semi-join the statistics against the reference ids, dropping rows the inner join would
+    # discard (partition pruning only helps for data laid out by category_id)
+    raw_df = AWSGlueDataCatalog_node1728935089386.toDF().filter(col("category_id").isin(category_ids))
+
+    # Join on the small reference data as a broadcast hash join so the statistics frame is never shuffled
+    joined_df = raw_df.join(broadcast(ref_df), raw_df.category_id == ref_df.id, "inner")
+    Join_node1728935104238 = DynamicFrame.fromDF(joined_df, glueContext, "Join_node1728935104238")
+
+    # Script generated for node Amazon S3
+    AmazonS3_node1728935210348 = glueContext.getSink(path="s3://de-youtube-analytics-reporting-useast1-dev", connection_type="s3", updateBehavior="UPDATE_IN_DATABASE", partitionKeys=["region", "category_id"], enableUpdateCatalog=True, transformation_ctx="AmazonS3_node1728935210348")
+    AmazonS3_node1728935210348.setCatalogInfo(catalogDatabase="db_youtube_analytics",catalogTableName="final_analytics")
+    AmazonS3_node1728935210348.setFormat("glueparquet", compression="zstd")
+    AmazonS3_node1728935210348.writeFrame(Join_node1728935104238)
+else:
+    print("No category ids found in the reference data, skipping the reporting join.")
 
-# Script generated for node Amazon S3
-AmazonS3_node1728935210348 = glueContext.getSink(path="s3://de-youtube-analytics-reporting-useast1-dev", connection_type="s3", updateBehavior="UPDATE_IN_DATABASE", partitionKeys=["region", "category_id"], enableUpdateCatalog=True, transformation_ctx="AmazonS3_node1728935210348")
-AmazonS3_node1728935210348.setCatalogInfo(catalogDatabase="db_youtube_analytics",catalogTableName="final_analytics")
-AmazonS3_node1728935210348.setFormat("glueparquet", compression="snappy")
-AmazonS3_node1728935210348.writeFrame(Join_node1728935104238)
 job.commit()
\ No newline at end of file